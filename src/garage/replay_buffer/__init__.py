@@ -4,6 +4,8 @@ This public package contains the replay buffer primitives.
 The replay buffer primitives can be used for RL algorithms.
 """
 from garage.replay_buffer.her_replay_buffer import HerReplayBuffer
+from garage.replay_buffer.prioritized_replay_buffer import (
+    PrioritizedReplayBuffer)
 from garage.replay_buffer.simple_replay_buffer import SimpleReplayBuffer
 
-__all__ = ['HerReplayBuffer', 'SimpleReplayBuffer']
+__all__ = ['HerReplayBuffer', 'PrioritizedReplayBuffer', 'SimpleReplayBuffer']
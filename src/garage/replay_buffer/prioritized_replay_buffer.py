@@ -0,0 +1,120 @@
+"""
+This module implements a prioritized replay buffer.
+
+See: https://arxiv.org/abs/1511.05952.
+"""
+import numpy as np
+
+from garage.misc.overrides import overrides
+from garage.replay_buffer.base import ReplayBuffer
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    This class implements PrioritizedReplayBuffer.
+
+    Transitions are sampled in proportion to their priority. Priorities
+    are kept in a sum-tree laid out as a flat array, where node i has
+    children 2i and 2i + 1 and the leaves hold one priority per stored
+    transition. Sampling descends the tree for the whole batch at once and
+    updates rebuild only the touched parents, level by level, so both cost
+    O(log n) vectorized operations instead of O(batch_size * log n) Python
+    steps.
+
+    Args:
+        alpha (float): How much prioritization is used, with 0 being
+            uniform sampling.
+        beta (float): Importance sampling exponent used for the weights
+            returned by sample().
+        eps (float): Small constant added to priorities so no transition
+            has zero probability of being sampled.
+        kwargs: Arguments passed to garage.replay_buffer.ReplayBuffer.
+
+    """
+
+    def __init__(self, alpha=0.6, beta=0.4, eps=1e-6, **kwargs):
+        super().__init__(**kwargs)
+        self._alpha = alpha
+        self._beta = beta
+        self._eps = eps
+        self._max_priority = 1.
+
+        n_leaves = self._size * self._time_horizon
+        self._tree_depth = int(np.ceil(np.log2(max(n_leaves, 2))))
+        self._tree_capacity = 2**self._tree_depth
+        self._tree = np.zeros(2 * self._tree_capacity)
+
+    @overrides
+    def sample(self, batch_size):
+        """
+        Sample a transition of batch_size.
+
+        Besides the stored entries, the returned transitions contain
+        'indices', to be passed back to update_priorities(), and 'weights',
+        the normalized importance sampling weights of the samples.
+        """
+        assert self._n_transitions_stored >= batch_size
+        total = self._tree[1]
+
+        # Draw one point from each of batch_size equal segments of the
+        # total priority, then descend the tree for all points together
+        points = (np.arange(batch_size) +
+                  np.random.uniform(size=batch_size)) * total / batch_size
+        nodes = np.ones(batch_size, dtype=int)
+        for _ in range(self._tree_depth):
+            left = 2 * nodes
+            left_sum = self._tree[left]
+            go_right = points > left_sum
+            points = np.where(go_right, points - left_sum, points)
+            nodes = np.where(go_right, left + 1, left)
+
+        # Guard against rounding walking past the last stored transition
+        n_stored = self._current_size * self._time_horizon
+        idxs = np.minimum(nodes - self._tree_capacity, n_stored - 1)
+
+        transitions = {}
+        for key, value in self._buffer.items():
+            transitions[key] = value.reshape(-1, *value.shape[2:]).take(
+                idxs, axis=0)
+
+        probs = self._tree[idxs + self._tree_capacity] / total
+        weights = (n_stored * probs)**-self._beta
+        transitions['indices'] = idxs
+        transitions['weights'] = weights / weights.max()
+
+        assert (transitions['action'].shape[0] == batch_size)
+        return transitions
+
+    def update_priorities(self, indices, priorities):
+        """
+        Update the priorities of sampled transitions.
+
+        Args:
+            indices (numpy.ndarray): The 'indices' returned by sample().
+            priorities (numpy.ndarray): New priorities, e.g. the absolute
+                TD errors of the sampled transitions.
+        """
+        priorities = np.abs(priorities) + self._eps
+        self._max_priority = max(self._max_priority, np.max(priorities))
+        self._set_priorities(indices, priorities**self._alpha)
+
+    @overrides
+    def _get_storage_idx(self, size_increment=1):
+        """Get the storage index and give new transitions max priority."""
+        idx = super()._get_storage_idx(size_increment)
+        episodes = np.atleast_1d(idx)
+        transition_idxs = (episodes[:, np.newaxis] * self._time_horizon +
+                           np.arange(self._time_horizon)).ravel()
+        self._set_priorities(
+            transition_idxs,
+            np.full(len(transition_idxs), self._max_priority**self._alpha))
+        return idx
+
+    def _set_priorities(self, indices, priorities):
+        """Write leaf priorities and recompute the sums above them."""
+        nodes = np.asarray(indices) + self._tree_capacity
+        self._tree[nodes] = priorities
+        for _ in range(self._tree_depth):
+            nodes = np.unique(nodes // 2)
+            left = 2 * nodes
+            self._tree[nodes] = self._tree[left] + self._tree[left + 1]
@@ -16,21 +16,17 @@ class SimpleReplayBuffer(ReplayBuffer):
     def sample(self, batch_size):
         """Sample a transition of batch_size."""
         assert self._n_transitions_stored >= batch_size
-        buffer = {}
-        for key in self._buffer.keys():
-            buffer[key] = self._buffer[key][:self._current_size]
 
-        # Select which episodes to use
-        time_horizon = buffer['action'].shape[1]
-        rollout_batch_size = buffer['action'].shape[0]
-        episode_idxs = np.random.randint(rollout_batch_size, size=batch_size)
-        # Select time steps to use
-        t_samples = np.random.randint(time_horizon, size=batch_size)
+        # Select transitions by flat index over the stored episodes, so
+        # each field is gathered from a (size * time_horizon) view with a
+        # single take instead of two-axis fancy indexing
+        n_stored = self._current_size * self._time_horizon
+        idxs = np.random.randint(n_stored, size=batch_size)
 
         transitions = {}
-        for key in buffer.keys():
-            samples = buffer[key][episode_idxs, t_samples]
-            transitions[key] = samples.reshape(batch_size, *samples.shape[1:])
+        for key, value in self._buffer.items():
+            transitions[key] = value.reshape(-1, *value.shape[2:]).take(
+                idxs, axis=0)
 
         assert (transitions['action'].shape[0] == batch_size)
         return transitions
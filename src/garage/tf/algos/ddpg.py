@@ -7,6 +7,7 @@ import tensorflow.contrib as tc
 
 from garage.misc.overrides import overrides
 from garage.np.algos.off_policy_rl_algorithm import OffPolicyRLAlgorithm
+import garage.tf.core.layers as L
 from garage.tf.misc import tensor_utils
 
 
@@ -106,6 +107,15 @@ class DDPG(OffPolicyRLAlgorithm):
 
         self.target_policy = policy.clone('target_policy')
 
+        # Scratch space for joining goals onto the sampled observations,
+        # reused by every optimize_policy call
+        if input_include_goal:
+            input_dim = env_spec.observation_space.flat_dim_with_keys(
+                ['observation', 'desired_goal'])
+            self._inputs_buf = np.empty((buffer_batch_size, input_dim),
+                                        dtype=np.float32)
+            self._next_inputs_buf = np.empty_like(self._inputs_buf)
+
         super(DDPG, self).__init__(
             env_spec=env_spec,
             policy=policy,
@@ -127,38 +137,12 @@ class DDPG(OffPolicyRLAlgorithm):
     @overrides
     def init_opt(self):
         with tf.name_scope(self.name, 'DDPG'):
-            # Create target policy and qf network
-            self.target_policy_f_prob_online = tensor_utils.compile_function(
-                inputs=[self.target_policy.model.networks['default'].input],
-                outputs=self.target_policy.model.networks['default'].outputs)
-            self.target_qf_f_prob_online, _, _, _ = self.qf.build_net(
-                trainable=False, name='target_qf')
-
-            # Set up target init and update function
-            with tf.name_scope('setup_target'):
-                ops = tensor_utils.get_target_ops(
-                    self.policy.get_global_vars(),
-                    self.target_policy.get_global_vars(), self.tau)
-                policy_init_ops, policy_update_ops = ops
-                qf_init_ops, qf_update_ops = tensor_utils.get_target_ops(
-                    self.qf.get_global_vars(),
-                    self.qf.get_global_vars('target_qf'), self.tau)
-                target_init_op = policy_init_ops + qf_init_ops
-                target_update_op = policy_update_ops + qf_update_ops
-
-            f_init_target = tensor_utils.compile_function(
-                inputs=[], outputs=target_init_op)
-            f_update_target = tensor_utils.compile_function(
-                inputs=[], outputs=target_update_op)
-
             with tf.name_scope('inputs'):
                 if self.input_include_goal:
                     obs_dim = self.env_spec.observation_space.\
                         flat_dim_with_keys(['observation', 'desired_goal'])
                 else:
                     obs_dim = self.env_spec.observation_space.flat_dim
-                y = tf.compat.v1.placeholder(
-                    tf.float32, shape=(None, 1), name='input_y')
                 obs = tf.compat.v1.placeholder(
                     tf.float32,
                     shape=(None, obs_dim),
@@ -167,6 +151,55 @@ class DDPG(OffPolicyRLAlgorithm):
                     tf.float32,
                     shape=(None, self.env_spec.action_space.flat_dim),
                     name='input_action')
+                next_obs = tf.compat.v1.placeholder(
+                    tf.float32,
+                    shape=(None, obs_dim),
+                    name='input_next_observation')
+                rewards = tf.compat.v1.placeholder(
+                    tf.float32, shape=None, name='input_reward')
+                terminals = tf.compat.v1.placeholder(
+                    tf.float32, shape=None, name='input_terminal')
+
+            # Create target policy and qf network
+            target_actions = self.target_policy.get_action_sym(
+                next_obs, name='target_action')
+            _, target_qf_output, target_qf_obs, target_qf_action = \
+                self.qf.build_net(trainable=False, name='target_qf')
+
+            # Set up target y, so that target inference and the bellman
+            # backup run inside the training step
+            with tf.name_scope('target_y'):
+                target_qvals = L.get_output(target_qf_output, {
+                    target_qf_obs: next_obs,
+                    target_qf_action: target_actions
+                })
+                # The backup hyperparameters are fixed per algorithm, so
+                # they are built once as graph constants
+                discount = tf.constant(
+                    self.discount, dtype=tf.float32, name='discount')
+                clip_lo = tf.constant(
+                    -self.clip_return, dtype=tf.float32, name='clip_lo')
+                clip_hi = tf.constant(
+                    0. if self.clip_pos_returns else self.clip_return,
+                    dtype=tf.float32,
+                    name='clip_hi')
+                # Rewards and terminals are fed as sampled from the replay
+                # buffer and shaped like target_qvals here
+                rewards_col = tf.reshape(rewards, (-1, 1))
+                terminals_col = tf.reshape(terminals, (-1, 1))
+                target_ys = tf.clip_by_value(
+                    rewards_col +
+                    (1.0 - terminals_col) * discount * target_qvals, clip_lo,
+                    clip_hi)
+                target_ys = tf.stop_gradient(target_ys)
+
+            # Collect the target variables before the optimizers add their
+            # slots to the same scopes
+            policy_vars = self.policy.get_global_vars()
+            target_policy_vars = self.target_policy.get_global_vars()
+            qf_vars = self.qf.get_global_vars()
+            target_qf_vars = self.qf.get_global_vars('target_qf')
+
             # Set up policy training function
             next_action = self.policy.get_action_sym(obs, name='policy_action')
             next_qval = self.qf.get_qval_sym(
@@ -180,18 +213,16 @@ class DDPG(OffPolicyRLAlgorithm):
                     action_loss += policy_reg
 
             with tf.name_scope('minimize_action_loss'):
-                policy_train_op = self.policy_optimizer(
-                    self.policy_lr, name='PolicyOptimizer').minimize(
-                        action_loss, var_list=self.policy.get_trainable_vars())
-
-            f_train_policy = tensor_utils.compile_function(
-                inputs=[obs], outputs=[policy_train_op, action_loss])
+                policy_optimizer = self.policy_optimizer(
+                    self.policy_lr, name='PolicyOptimizer')
+                policy_grads = policy_optimizer.compute_gradients(
+                    action_loss, var_list=self.policy.get_trainable_vars())
 
             # Set up qf training function
             qval = self.qf.get_qval_sym(obs, actions, name='q_value')
             with tf.name_scope('qval_loss'):
                 qval_loss = tf.reduce_mean(
-                    tf.compat.v1.squared_difference(y, qval))
+                    tf.compat.v1.squared_difference(target_ys, qval))
                 if self.qf_weight_decay > 0.:
                     qf_reg = tc.layers.apply_regularization(
                         tc.layers.l2_regularizer(self.qf_weight_decay),
@@ -199,27 +230,63 @@ class DDPG(OffPolicyRLAlgorithm):
                     qval_loss += qf_reg
 
             with tf.name_scope('minimize_qf_loss'):
-                qf_train_op = self.qf_optimizer(
-                    self.qf_lr, name='QFunctionOptimizer').minimize(
-                        qval_loss, var_list=self.qf.get_trainable_vars())
-
-            f_train_qf = tensor_utils.compile_function(
-                inputs=[y, obs, actions],
-                outputs=[qf_train_op, qval_loss, qval])
-
-            self.f_train_policy = f_train_policy
-            self.f_train_qf = f_train_qf
-            self.f_init_target = f_init_target
-            self.f_update_target = f_update_target
+                qf_optimizer = self.qf_optimizer(
+                    self.qf_lr, name='QFunctionOptimizer')
+                qf_grads = qf_optimizer.compute_gradients(
+                    qval_loss, var_list=self.qf.get_trainable_vars())
+
+            # Both gradients are computed before either network is updated,
+            # so the qf and policy steps can share one session call
+            with tf.name_scope('apply_gradients'):
+                with tf.control_dependencies([
+                        grad for grad, _ in policy_grads + qf_grads
+                        if grad is not None
+                ]):
+                    qf_train_op = qf_optimizer.apply_gradients(qf_grads)
+                    policy_train_op = policy_optimizer.apply_gradients(
+                        policy_grads)
+                train_op = tf.group(qf_train_op, policy_train_op)
+
+            # Chain the target update after the train op, so that one
+            # session call performs a whole training step. The first step
+            # copies the networks into their targets instead of soft
+            # updating them, so no separate init call has to be ordered
+            # before training.
+            with tf.name_scope('update_target'):
+                targets_initialized = tf.compat.v1.Variable(
+                    False, trainable=False, name='targets_initialized')
+                with tf.control_dependencies([train_op]):
+                    targets_ready = targets_initialized.read_value()
+
+                def init_targets():
+                    policy_init_ops = tensor_utils.get_target_ops(
+                        policy_vars, target_policy_vars)
+                    qf_init_ops = tensor_utils.get_target_ops(
+                        qf_vars, target_qf_vars)
+                    return tf.group(*(policy_init_ops + qf_init_ops),
+                                    targets_initialized.assign(True))
+
+                def update_targets():
+                    _, policy_update_ops = tensor_utils.get_target_ops(
+                        policy_vars, target_policy_vars, self.tau)
+                    _, qf_update_ops = tensor_utils.get_target_ops(
+                        qf_vars, target_qf_vars, self.tau)
+                    return tf.group(*(policy_update_ops + qf_update_ops))
+
+                train_step_op = tf.cond(targets_ready, update_targets,
+                                        init_targets)
+
+            f_train = tensor_utils.compile_function(
+                inputs=[obs, actions, next_obs, rewards, terminals],
+                outputs=[
+                    train_step_op, qval_loss, target_ys, qval, action_loss
+                ])
+
+            self.f_train = f_train
 
     def __getstate__(self):
         data = self.__dict__.copy()
-        del data['target_policy_f_prob_online']
-        del data['target_qf_f_prob_online']
-        del data['f_train_policy']
-        del data['f_train_qf']
-        del data['f_init_target']
-        del data['f_update_target']
+        del data['f_train']
         return data
 
     def __setstate__(self, state):
@@ -305,31 +372,21 @@ class DDPG(OffPolicyRLAlgorithm):
         next_observations = transitions['next_observation']
         terminals = transitions['terminal']
 
-        rewards = rewards.reshape(-1, 1)
-        terminals = terminals.reshape(-1, 1)
-
         if self.input_include_goal:
             goals = transitions['goal']
-            next_inputs = np.concatenate((next_observations, goals), axis=-1)
-            inputs = np.concatenate((observations, goals), axis=-1)
+            obs_dim = observations.shape[-1]
+            inputs = self._inputs_buf
+            inputs[:, :obs_dim] = observations
+            inputs[:, obs_dim:] = goals
+            next_inputs = self._next_inputs_buf
+            next_inputs[:, :obs_dim] = next_observations
+            next_inputs[:, obs_dim:] = goals
         else:
             next_inputs = next_observations
             inputs = observations
 
-        target_actions = self.target_policy_f_prob_online(next_inputs)
-        target_qvals = self.target_qf_f_prob_online(next_inputs,
-                                                    target_actions)
-
-        clip_range = (-self.clip_return,
-                      0. if self.clip_pos_returns else self.clip_return)
-        ys = np.clip(
-            rewards + (1.0 - terminals) * self.discount * target_qvals,
-            clip_range[0], clip_range[1])
-
-        _, qval_loss, qval = self.f_train_qf(ys, inputs, actions)
-        _, action_loss = self.f_train_policy(inputs)
-
-        self.f_update_target()
+        _, qval_loss, ys, qval, action_loss = self.f_train(
+            inputs, actions, next_inputs, rewards, terminals)
 
         return qval_loss, ys, qval, action_loss
 
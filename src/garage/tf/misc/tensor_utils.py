@@ -35,11 +35,14 @@ def get_target_ops(variables, target_variables, tau=None):
     init_ops = []
     assert len(variables) == len(target_variables)
     for var, target_var in zip(variables, target_variables):
-        init_ops.append(tf.compat.v1.assign(target_var, var))
+        # Read the variables explicitly, so the reads honour any enclosing
+        # tf.control_dependencies
+        init_ops.append(tf.compat.v1.assign(target_var, var.read_value()))
         if tau is not None:
             update_ops.append(
-                tf.compat.v1.assign(target_var,
-                                    tau * var + (1.0 - tau) * target_var))
+                tf.compat.v1.assign(
+                    target_var, tau * var.read_value() +
+                    (1.0 - tau) * target_var.read_value()))
 
     if tau is not None:
         return init_ops, update_ops
@@ -149,7 +149,15 @@ def run_garage(env, seed, log_dir):
     '''
     deterministic.set_seed(seed)
 
-    with LocalTFRunner() as runner:
+    # Let XLA auto-cluster the fused DDPG train step. Ops that XLA cannot
+    # compile run as before, and on CPU this additionally needs
+    # TF_XLA_FLAGS=--tf_xla_cpu_global_jit.
+    config = tf.compat.v1.ConfigProto()
+    config.graph_options.optimizer_options.global_jit_level = (
+        tf.compat.v1.OptimizerOptions.ON_1)
+
+    with tf.compat.v1.Session(config=config) as sess, \
+            LocalTFRunner(sess=sess) as runner:
         env = TfEnv(normalize(env))
         # Set up params for ddpg
         action_noise = OUStrategy(env.spec, sigma=params['sigma'])
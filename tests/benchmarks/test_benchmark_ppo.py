@@ -33,6 +33,7 @@ from garage.tf.envs import TfEnv
 from garage.tf.experiment import LocalTFRunner
 from garage.tf.optimizers import FirstOrderOptimizer
 from garage.tf.policies import GaussianMLPPolicy
+from tests.fixtures.logger import AsyncOutput
 import tests.helpers as Rh
 from tests.wrappers import AutoStopEnv
 
@@ -54,38 +55,25 @@ class TestBenchmarkPPO:
         for task in mujoco1m['tasks']:
             env_id = task['env_id']
 
-            env = gym.make(env_id)
-            baseline_env = AutoStopEnv(env_name=env_id, max_path_length=100)
-
             seeds = random.sample(range(100), task['trials'])
 
             task_dir = osp.join(benchmark_dir, env_id)
             plt_file = osp.join(benchmark_dir,
                                 '{}_benchmark.png'.format(env_id))
-            baselines_csvs = []
-            garage_csvs = []
-
-            for trial in range(task['trials']):
-                seed = seeds[trial]
-
-                trial_dir = task_dir + '/trial_%d_seed_%d' % (trial + 1, seed)
-                garage_dir = trial_dir + '/garage'
-                baselines_dir = trial_dir + '/baselines'
-
-                with tf.Graph().as_default():
-                    # Run baselines algorithms
-                    baseline_env.reset()
-                    baselines_csv = run_baselines(baseline_env, seed,
-                                                  baselines_dir)
-
-                    # Run garage algorithms
-                    env.reset()
-                    garage_csv = run_garage(env, seed, garage_dir)
-
-                garage_csvs.append(garage_csv)
-                baselines_csvs.append(baselines_csv)
-
-            env.close()
+            trial_args = [
+                (env_id, seed,
+                 task_dir + '/trial_%d_seed_%d' % (trial + 1, seed))
+                for trial, seed in enumerate(seeds)
+            ]
+
+            # Each trial runs in a fresh process with its own graph and
+            # session, since TensorFlow is not fork-safe. run_baselines()
+            # sizes its thread pools to half the cpus, so two trials at a
+            # time fill the machine.
+            n_workers = min(task['trials'], 2)
+            with multiprocessing.get_context('spawn').Pool(n_workers) as pool:
+                results = pool.starmap(run_trial, trial_args)
+            baselines_csvs, garage_csvs = map(list, zip(*results))
 
             Rh.plot(
                 b_csvs=baselines_csvs,
@@ -116,6 +104,33 @@ class TestBenchmarkPPO:
         Rh.write_file(result_json, 'PPO')
 
 
+def run_trial(env_id, seed, trial_dir):
+    '''
+    Run one trial of baselines and garage.
+
+    :param env_id: Id of the gym environment.
+    :param seed: Random seed for the trial.
+    :param trial_dir: Log dir path of the trial.
+    :return: The baselines and garage csv paths.
+    '''
+    env = gym.make(env_id)
+    baseline_env = AutoStopEnv(env_name=env_id, max_path_length=100)
+
+    with tf.Graph().as_default():
+        # Run baselines algorithms
+        baseline_env.reset()
+        baselines_csv = run_baselines(baseline_env, seed,
+                                      trial_dir + '/baselines')
+
+        # Run garage algorithms
+        env.reset()
+        garage_csv = run_garage(env, seed, trial_dir + '/garage')
+
+    env.close()
+
+    return baselines_csv, garage_csv
+
+
 def run_garage(env, seed, log_dir):
     '''
     Create garage model and training.
@@ -173,12 +188,16 @@ def run_garage(env, seed, log_dir):
         tabular_log_file = osp.join(log_dir, 'progress.csv')
         dowel_logger.add_output(dowel.StdOutput())
         dowel_logger.add_output(dowel.CsvOutput(tabular_log_file))
-        dowel_logger.add_output(dowel.TensorBoardOutput(log_dir))
+        # TensorBoard flushes its event files on every dump, so write them
+        # from a background thread to keep disk IO off the training loop
+        tensorboard_output = AsyncOutput(dowel.TensorBoardOutput(log_dir))
+        dowel_logger.add_output(tensorboard_output)
 
         runner.setup(algo, env)
         runner.train(n_epochs=488, batch_size=2048)
 
         dowel_logger.remove_all()
+        tensorboard_output.close()
 
         return tabular_log_file
 
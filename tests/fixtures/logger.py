@@ -1,3 +1,5 @@
+import concurrent.futures
+
 from dowel import LogOutput, TabularInput
 
 
@@ -13,3 +15,45 @@ class NullOutput(LogOutput):
         """Don't do anything."""
         if isinstance(data, TabularInput):
             data.mark_all()
+
+
+class AsyncOutput(LogOutput):
+    """
+    Output which runs another output on a background thread.
+
+    Records and dumps are handed to a single worker thread in order, so
+    slow outputs (e.g. TensorBoard event files) do not block training.
+
+    :param output(dowel.LogOutput): The output to run in the background.
+    """
+
+    def __init__(self, output):
+        self._output = output
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    @property
+    def types_accepted(self):
+        """Accept the types of the wrapped output."""
+        return self._output.types_accepted
+
+    def record(self, data, prefix=''):
+        """Queue data to be recorded by the wrapped output."""
+        if isinstance(data, TabularInput):
+            # The logger clears the shared tabular right after dumping it,
+            # so hand the worker a copy. The wrapped output will consume
+            # every key, so mark them on the original.
+            table = TabularInput()
+            for key, value in data.as_dict.items():
+                table.record(key, value)
+            data.mark_all()
+            data = table
+        self._executor.submit(self._output.record, data, prefix)
+
+    def dump(self, step=None):
+        """Queue a dump of the wrapped output."""
+        self._executor.submit(self._output.dump, step)
+
+    def close(self):
+        """Wait for queued work, then close the wrapped output."""
+        self._executor.shutdown(wait=True)
+        self._output.close()
@@ -0,0 +1,55 @@
+import numpy as np
+
+from garage.replay_buffer import PrioritizedReplayBuffer
+from tests.fixtures.envs.dummy import DummyDiscreteEnv
+
+
+class TestPrioritizedReplayBuffer:
+    def test_sample_new_transitions_uniformly(self):
+        env = DummyDiscreteEnv()
+        obs = env.reset()
+        replay_buffer = PrioritizedReplayBuffer(
+            env_spec=env, size_in_transitions=4, time_horizon=1)
+        replay_buffer.add_transitions(
+            observation=[obs, obs, obs, obs], action=[1, 2, 3, 4])
+        sample = replay_buffer.sample(4)
+
+        # All transitions start at max priority and one point is drawn
+        # from each quarter of the total priority
+        assert np.array_equal(np.sort(sample['action']), [1, 2, 3, 4])
+        assert np.allclose(sample['weights'], 1.)
+
+    def test_update_priorities(self):
+        env = DummyDiscreteEnv()
+        obs = env.reset()
+        replay_buffer = PrioritizedReplayBuffer(
+            env_spec=env,
+            size_in_transitions=3,
+            time_horizon=1,
+            alpha=1.,
+            eps=0.)
+        replay_buffer.add_transitions(
+            observation=[obs, obs, obs], action=[1, 2, 3])
+        replay_buffer.update_priorities(np.array([0, 1, 2]), [0., 0., 5.])
+        sample = replay_buffer.sample(3)
+
+        assert np.array_equal(sample['action'], [3, 3, 3])
+        assert np.array_equal(sample['indices'], [2, 2, 2])
+        assert replay_buffer._tree[1] == 5.
+
+    def test_eviction_resets_priority(self):
+        env = DummyDiscreteEnv()
+        obs = env.reset()
+        replay_buffer = PrioritizedReplayBuffer(
+            env_spec=env,
+            size_in_transitions=2,
+            time_horizon=1,
+            alpha=1.,
+            eps=0.)
+        replay_buffer.add_transitions(observation=[obs, obs], action=[1, 2])
+        replay_buffer.update_priorities(np.array([0, 1]), [0., 4.])
+        replay_buffer.add_transitions(observation=[obs], action=[3])
+
+        # The overwritten slot gets the max priority seen so far
+        assert np.array_equal(replay_buffer._buffer['action'], [[3], [2]])
+        assert np.allclose(replay_buffer._tree[2:4], [4., 4.])
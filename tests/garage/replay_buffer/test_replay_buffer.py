@@ -48,3 +48,17 @@ class TestReplayBuffer:
 
         assert np.array_equal(replay_buffer._buffer['action'], [[7], [8], [6]])
         assert replay_buffer.n_transitions_stored == 3
+
+    def test_sample_from_stored_transitions(self):
+        env = DummyDiscreteEnv()
+        obs = env.reset()
+
+        replay_buffer = SimpleReplayBuffer(
+            env_spec=env, size_in_transitions=6, time_horizon=2)
+        replay_buffer.add_transitions(observation=[obs], action=[1])
+        replay_buffer.add_transitions(observation=[obs], action=[2])
+        sample = replay_buffer.sample(2)
+
+        assert sample['action'].shape == (2, )
+        # Unfilled episodes in the buffer hold zeros and are never sampled
+        assert set(sample['action']) <= {1, 2}